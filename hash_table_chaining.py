@@ -1,23 +1,24 @@
 
 import random
-from dataclasses import dataclass
 from typing import Any, List, Optional
 
-
-@dataclass
-class Entry:
-    key: int
-    value: Any
+_MASK64 = (1 << 64) - 1
 
 
 class HashTableChaining:
     """
     Hash table with chaining for collision resolution.
 
-    Buckets are lists of Entry objects. The hash function uses randomized
-    MAD compression:
-        h(k) = ((a*k + b) mod p) mod m
-    where p is a large prime, and (a, b) are randomized per table instance.
+    Each bucket is stored as two parallel lists (struct-of-arrays): bucket i
+    holds its keys in _keys[i] and the matching values in _values[i]. Chain
+    scans are C-level `list.index` calls over plain ints, and no per-entry
+    object is allocated. Buckets are None until their first insert, so an
+    empty or sparse table does not hold m empty lists. The hash function is
+    Knuth's multiplicative method in its multiply-shift form:
+        h(k) = ((a*k) mod 2^64) >> (64 - log2 m)
+    where a is a random odd 64-bit multiplier, re-drawn per table instance and
+    on every resize. Because m is a power of two, this needs one multiply and
+    a shift instead of two big-int modulos.
     """
 
     def __init__(self, capacity: int = 16, load_factor_max: float = 0.75) -> None:
@@ -25,73 +26,107 @@ class HashTableChaining:
             capacity = 1
 
         self._m = 1
+        log2_m = 0
         while self._m < capacity:
             self._m <<= 1
+            log2_m += 1
 
-        self._buckets: List[List[Entry]] = [[] for _ in range(self._m)]
+        self._keys: List[Optional[List[int]]] = [None] * self._m
+        self._values: List[Optional[List[Any]]] = [None] * self._m
         self._n = 0
         self._lf_max = float(load_factor_max)
+        self._a = random.getrandbits(64) | 1
+        self._shift = 64 - log2_m
+        # insert() grows the table once n/m exceeds load_factor_max, i.e. n > _max_n
+        self._max_n = self._lf_max * self._m
 
-        self._p = 2_147_483_647  # large prime near 2^31-1
-        self._a = random.randint(1, self._p - 1)
-        self._b = random.randint(0, self._p - 1)
-
-    def _hash(self, key: int) -> int:
-        return ((self._a * key + self._b) % self._p) % self._m
+    # The hash is inlined in insert/search/delete/_rehash as
+    #     ((a * key) & _MASK64) >> shift
+    # to avoid a method call and repeated attribute loads per operation.
 
     def _rehash(self, new_capacity: int) -> None:
-        items = []
-        for bucket in self._buckets:
-            for e in bucket:
-                items.append((e.key, e.value))
-
-        self._m = 1
-        while self._m < new_capacity:
-            self._m <<= 1
-        self._buckets = [[] for _ in range(self._m)]
-        self._n = 0
-
-        # Re-randomize hash parameters during resize
-        self._a = random.randint(1, self._p - 1)
-        self._b = random.randint(0, self._p - 1)
-
-        for k, v in items:
-            self.insert(k, v)
-
-    def _maybe_resize(self) -> None:
-        if self.load_factor() > self._lf_max:
-            self._rehash(self._m * 2)
+        m = 1
+        log2_m = 0
+        while m < new_capacity:
+            m <<= 1
+            log2_m += 1
+        new_keys: List[Optional[List[int]]] = [None] * m
+        new_values: List[Optional[List[Any]]] = [None] * m
+
+        # Re-randomize the hash multiplier during resize
+        a = random.getrandbits(64) | 1
+        shift = 64 - log2_m
+
+        # Keys are already unique, so entries go straight into their new
+        # bucket: no duplicate scan and no per-entry resize check.
+        for keys, values in zip(self._keys, self._values):
+            if keys is None:
+                continue
+            for k, v in zip(keys, values):
+                idx = ((a * k) & _MASK64) >> shift
+                bucket = new_keys[idx]
+                if bucket is None:
+                    new_keys[idx] = [k]
+                    new_values[idx] = [v]
+                else:
+                    bucket.append(k)
+                    new_values[idx].append(v)
+
+        self._m, self._shift, self._a = m, shift, a
+        self._max_n = self._lf_max * m
+        self._keys, self._values = new_keys, new_values
 
     def insert(self, key: int, value: Any) -> None:
-        idx = self._hash(key)
-        bucket = self._buckets[idx]
-
-        for e in bucket:
-            if e.key == key:
-                e.value = value
+        idx = ((self._a * key) & _MASK64) >> self._shift
+        keys = self._keys[idx]
+
+        if keys is None:
+            self._keys[idx] = [key]
+            self._values[idx] = [value]
+        else:
+            # Single lookup-or-insert pass: one index() scan decides update vs append
+            values = self._values[idx]
+            try:
+                i = keys.index(key)
+            except ValueError:
+                keys.append(key)
+                values.append(value)
+            else:
+                values[i] = value
                 return
-
-        bucket.append(Entry(key, value))
         self._n += 1
-        self._maybe_resize()
+        if self._n > self._max_n:
+            self._rehash(self._m * 2)
 
     def search(self, key: int) -> Optional[Any]:
-        idx = self._hash(key)
-        bucket = self._buckets[idx]
-        for e in bucket:
-            if e.key == key:
-                return e.value
-        return None
+        idx = ((self._a * key) & _MASK64) >> self._shift
+        keys = self._keys[idx]
+        if keys is None:
+            return None
+        try:
+            i = keys.index(key)
+        except ValueError:
+            return None
+        return self._values[idx][i]
 
     def delete(self, key: int) -> bool:
-        idx = self._hash(key)
-        bucket = self._buckets[idx]
-        for i, e in enumerate(bucket):
-            if e.key == key:
-                bucket.pop(i)
-                self._n -= 1
-                return True
-        return False
+        idx = ((self._a * key) & _MASK64) >> self._shift
+        keys = self._keys[idx]
+        if keys is None:
+            return False
+        try:
+            i = keys.index(key)
+        except ValueError:
+            return False
+
+        # Chain order is irrelevant: move the last entry into the hole, O(1) pop
+        values = self._values[idx]
+        keys[i] = keys[-1]
+        values[i] = values[-1]
+        keys.pop()
+        values.pop()
+        self._n -= 1
+        return True
 
     def size(self) -> int:
         return self._n
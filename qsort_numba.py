@@ -0,0 +1,111 @@
+
+from array import array
+from typing import MutableSequence, Optional, Tuple
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def _partition3(a: np.ndarray, lo: int, hi: int, pivot_idx: int) -> Tuple[int, int]:
+    """
+    3-way partition of a[lo:hi+1] around a[pivot_idx], in place.
+    After partition:
+      a[lo:lt]     < pivot
+      a[lt:gt+1]   = pivot
+      a[gt+1:hi+1] > pivot
+    Returns (lt, gt).
+    """
+    pivot = a[pivot_idx]
+    a[lo], a[pivot_idx] = a[pivot_idx], a[lo]
+
+    lt = lo
+    i = lo + 1
+    gt = hi
+
+    while i <= gt:
+        x = a[i]
+        if x < pivot:
+            lt += 1
+            a[i] = a[lt]
+            a[lt] = x
+            i += 1
+        elif x > pivot:
+            a[i] = a[gt]
+            a[gt] = x
+            gt -= 1
+        else:
+            i += 1
+
+    a[lo], a[lt] = a[lt], a[lo]
+    return lt, gt
+
+
+@njit(cache=True)
+def _qs(a: np.ndarray, lo: int, hi: int) -> None:
+    """
+    Iterative randomized quicksort of a[lo:hi+1].
+    The larger side is pushed and the smaller side is sorted next, so the
+    explicit stack never holds more than ~log2(n) ranges.
+    """
+    depth = 64
+    m = hi - lo + 1
+    while m > 0:
+        depth += 2
+        m >>= 1
+    stack = np.empty((depth, 2), np.int64)
+    top = 0
+
+    while True:
+        while lo < hi:
+            pivot_idx = np.random.randint(lo, hi + 1)
+            lt, gt = _partition3(a, lo, hi, pivot_idx)
+            if lt - lo < hi - gt:
+                stack[top, 0] = gt + 1
+                stack[top, 1] = hi
+                hi = lt - 1
+            else:
+                stack[top, 0] = lo
+                stack[top, 1] = lt - 1
+                lo = gt + 1
+            top += 1
+        if top == 0:
+            break
+        top -= 1
+        lo = stack[top, 0]
+        hi = stack[top, 1]
+
+
+@njit(cache=True)
+def _seed(seed: int) -> None:
+    np.random.seed(seed)
+
+
+def seed(value: int) -> None:
+    """Seed Numba's pivot RNG (separate from both `random` and `np.random`)."""
+    _seed(value)
+
+
+def numba_quicksort(
+    arr: MutableSequence[int], workspace: Optional[MutableSequence[int]] = None
+) -> MutableSequence[int]:
+    """
+    Randomized quicksort with 3-way partitioning, compiled with Numba.
+    Returns the same container type it is given (list or array('q')).
+    `workspace` is a result of an earlier call on an input of the same type and
+    length; it is refilled and returned instead of allocating a new one.
+    """
+    if isinstance(arr, array) and arr.typecode == "q":
+        if workspace is None:
+            out = arr[:]  # do not mutate caller
+        else:
+            out = workspace
+            out[:] = arr  # memcpy into the existing buffer
+        _qs(np.frombuffer(out, dtype=np.int64), 0, len(out) - 1)  # sort in place via zero-copy view
+        return out
+    a = np.array(arr, dtype=np.int64)
+    _qs(a, 0, len(a) - 1)
+    if workspace is None:
+        return a.tolist()
+    workspace[:] = a.tolist()
+    return workspace
@@ -1,116 +1,274 @@
 
 import argparse
-import csv
+import multiprocessing
 import random
-import time
-import sys
+import timeit
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass
-from typing import Callable, List, Tuple
+from typing import Callable, List, MutableSequence, Optional, Tuple
 
+try:
+    import cython
+except ImportError:  # plain CPython never evaluates the local cython.* annotations below
+    cython = None
 
-def partition_3way(arr: List[int], lo: int, hi: int, pivot_index: int) -> Tuple[int, int]:
-    """
-    3-way partition around pivot value.
-    After partition:
-      arr[lo:lt]     < pivot
-      arr[lt:gt+1]   = pivot
-      arr[gt+1:hi+1] > pivot
-    Returns (lt, gt).
-    """
-    pivot = arr[pivot_index]
-    arr[lo], arr[pivot_index] = arr[pivot_index], arr[lo]  # move pivot to front
+try:
+    import qsort_numba
+except ImportError:  # numba/numpy are optional
+    qsort_numba = None
 
-    lt = lo
-    i = lo + 1
-    gt = hi
 
-    while i <= gt:
-        if arr[i] < pivot:
-            lt += 1
-            arr[lt], arr[i] = arr[i], arr[lt]
-            i += 1
-        elif arr[i] > pivot:
-            arr[i], arr[gt] = arr[gt], arr[i]
-            gt -= 1
-        else:
-            i += 1
+# Ranges shorter than this are finished with insertion sort
+_INSERTION_CUTOFF = 16
 
-    arr[lo], arr[lt] = arr[lt], arr[lo]  # pivot to final position
-    return lt, gt
 
+def _insertion_sort(a: list, lo: int, hi: int) -> None:
+    """In-place insertion sort of a[lo:hi+1]."""
+    i: cython.Py_ssize_t
+    j: cython.Py_ssize_t
+    x: object
+    for i in range(lo + 1, hi + 1):
+        x = a[i]
+        j = i - 1
+        while j >= lo and a[j] > x:
+            a[j + 1] = a[j]
+            j -= 1
+        a[j + 1] = x
 
-def randomized_quicksort(arr: List[int]) -> List[int]:
-    """Randomized pivot quicksort with 3-way partitioning."""
-    a = arr[:]  # do not mutate caller
 
-    def _qs(lo: int, hi: int) -> None:
-        if lo >= hi:
-            return
-        pivot_index = random.randint(lo, hi)
-        lt, gt = partition_3way(a, lo, hi, pivot_index)
-        _qs(lo, lt - 1)
-        _qs(gt + 1, hi)
+def _quicksort(a: list, choose_pivot: Callable[[int, int], int]) -> None:
+    """
+    In-place 3-way quicksort of `a` driven by an explicit stack.
+    The larger side is pushed and the loop continues on the smaller side,
+    so the stack holds O(log n) ranges regardless of pivot quality.
+    Each step 3-way partitions a[lo:hi+1] around the pivot value, leaving
+      a[lo:lt] < pivot,  a[lt:gt+1] == pivot,  a[gt+1:hi+1] > pivot;
+    the partition is written inline to avoid a call per range, and ranges
+    shorter than _INSERTION_CUTOFF are left to insertion sort.
+    `choose_pivot(lo, stop)` returns a pivot index in [lo, stop), the same
+    convention as random.randrange, so that can be passed in directly.
+
+    Local annotations are Cython pure-Python declarations; no-ops under CPython.
+    """
+    lo: cython.Py_ssize_t
+    hi: cython.Py_ssize_t
+    lt: cython.Py_ssize_t
+    gt: cython.Py_ssize_t
+    i: cython.Py_ssize_t
+    pivot_index: cython.Py_ssize_t
+    pivot: object
+    x: object
+
+    stack = [(0, len(a) - 1)]
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        lo, hi = pop()
+        while hi - lo >= _INSERTION_CUTOFF:
+            pivot_index = choose_pivot(lo, hi + 1)
+            pivot = a[pivot_index]
+            a[pivot_index] = a[lo]
+            a[lo] = pivot
+
+            lt = lo
+            i = lo + 1
+            gt = hi
+            while i <= gt:
+                x = a[i]
+                if x < pivot:
+                    lt += 1
+                    a[i] = a[lt]
+                    a[lt] = x
+                    i += 1
+                elif x > pivot:
+                    a[i] = a[gt]
+                    a[gt] = x
+                    gt -= 1
+                else:
+                    i += 1
+            a[lo] = a[lt]
+            a[lt] = pivot
+
+            if lt - lo < hi - gt:
+                push((gt + 1, hi))
+                hi = lt - 1
+            else:
+                push((lo, lt - 1))
+                lo = gt + 1
+        if lo < hi:
+            _insertion_sort(a, lo, hi)
+
+
+def _working_copy(arr: MutableSequence[int], workspace: Optional[List[int]]) -> List[int]:
+    """
+    Copy `arr` into the list the sort will run on.
+    `workspace` is a list returned by an earlier call on an input of the same
+    length; its storage is refilled instead of allocating a new list.
+    """
+    if workspace is None:
+        return list(arr)
+    workspace[:] = arr
+    return workspace
+
 
-    _qs(0, len(a) - 1)
+def randomized_quicksort(arr: MutableSequence[int], workspace: Optional[List[int]] = None) -> List[int]:
+    """Randomized pivot quicksort with 3-way partitioning."""
+    a = _working_copy(arr, workspace)  # do not mutate caller
+    _quicksort(a, random.randrange)  # not randint: that is a Python wrapper around randrange
     return a
 
 
-def deterministic_quicksort_first_pivot(arr: List[int]) -> List[int]:
+def _first_pivot(lo: int, stop: int) -> int:
+    return lo
+
+
+def deterministic_quicksort_first_pivot(
+    arr: MutableSequence[int], workspace: Optional[List[int]] = None
+) -> List[int]:
     """Deterministic quicksort using first element as pivot + 3-way partitioning."""
-    a = arr[:]
+    a = _working_copy(arr, workspace)
+    _quicksort(a, _first_pivot)
+    return a
+
+
+def deterministic_quicksort_median_of_three(
+    arr: MutableSequence[int], workspace: Optional[List[int]] = None
+) -> List[int]:
+    """
+    Deterministic quicksort using a median-of-three pivot + 3-way partitioning.
+    Ranges longer than 40 use Tukey's ninther (median of three medians-of-three),
+    so sorted and reverse-sorted inputs no longer trigger the O(n^2) worst case.
+    """
+    a = _working_copy(arr, workspace)
+
+    def _median3(i: int, j: int, k: int) -> int:
+        x, y, z = a[i], a[j], a[k]
+        if x < y:
+            if y < z:
+                return j
+            return k if x < z else i
+        if x < z:
+            return i
+        return k if y < z else j
+
+    def _pivot(lo: int, stop: int) -> int:
+        hi = stop - 1
+        mid = (lo + hi) // 2
+        if hi - lo > 40:
+            s = (hi - lo) // 8
+            return _median3(
+                _median3(lo, lo + s, lo + 2 * s),
+                _median3(mid - s, mid, mid + s),
+                _median3(hi - 2 * s, hi - s, hi),
+            )
+        return _median3(lo, mid, hi)
+
+    _quicksort(a, _pivot)
+    return a
 
-    def _qs(lo: int, hi: int) -> None:
-        if lo >= hi:
-            return
-        pivot_index = lo
-        lt, gt = partition_3way(a, lo, hi, pivot_index)
-        _qs(lo, lt - 1)
-        _qs(gt + 1, hi)
 
-    _qs(0, len(a) - 1)
+def builtin_sort(arr: MutableSequence[int], workspace: Optional[List[int]] = None) -> List[int]:
+    """Reference baseline: CPython's built-in Timsort (implemented in C)."""
+    a = _working_copy(arr, workspace)
+    a.sort()
     return a
 
 
 @dataclass
 class Case:
     name: str
-    generator: Callable[[int], List[int]]
+    generator: Callable[[int], array]
+
 
+# Inputs are array('q') buffers: 8 bytes per element instead of a pointer to a
+# 28-byte int object, and a buffer the compiled sorts can use without copying.
+# random.choices is still a Python-level loop; it only avoids randint's
+# randrange/_randbelow call chain on every draw.
+def gen_random(n: int) -> array:
+    return array("q", random.choices(range(10**7 + 1), k=n))
 
-def gen_random(n: int) -> List[int]:
-    return [random.randint(0, 10**7) for _ in range(n)]
 
+def gen_sorted(n: int) -> array:
+    return array("q", range(n))
 
-def gen_sorted(n: int) -> List[int]:
-    return list(range(n))
 
+def gen_reverse_sorted(n: int) -> array:
+    return array("q", range(n, 0, -1))
 
-def gen_reverse_sorted(n: int) -> List[int]:
-    return list(range(n, 0, -1))
 
+def gen_repeated(n: int) -> array:
+    return array("q", random.choices(range(21), k=n))
 
-def gen_repeated(n: int) -> List[int]:
-    return [random.randint(0, 20) for _ in range(n)]
+
+def time_func(
+    func: Callable[..., MutableSequence[int]],
+    arr: MutableSequence[int],
+    expected: bytes,
+    repeats: int = 3,
+) -> float:
+    """
+    Best-of-N timing via timeit, with correctness check against precomputed
+    `expected` (= the raw int64 bytes of sorted(arr)).
+
+    One untimed call checks the output (and warms up any JIT); its result is
+    then passed back as `workspace` on every timed call, so runs refill one
+    buffer instead of allocating a fresh copy. Timer.autorange picks a loop
+    count that makes each sample >= 0.2 s, which keeps fast cells above the
+    clock's noise floor; the reported time is per call.
+    """
+    if repeats < 1:
+        raise ValueError(f"repeats must be >= 1, got {repeats}")
+    out = func(arr)
+    check = out if isinstance(out, array) else array("q", out)
+    if bytes(check) != expected:  # one memcmp, not n int comparisons
+        raise ValueError(f"Sorting failed for {func.__name__}")
+
+    timer = timeit.Timer(lambda: func(arr, workspace=out))
+    number, first = timer.autorange()
+    if number == 1:
+        # Slow cell: the autorange probe already is a full sample, keep it
+        samples = timer.repeat(repeat=repeats - 1, number=1) + [first]
+    else:
+        samples = timer.repeat(repeat=repeats, number=number)
+    return min(samples) / number
+
+
+def run_cell(task: Tuple) -> float:
+    """
+    Time one (case, n, algorithm) cell; runs in a worker process.
+    The pivot RNGs are re-seeded per cell so results do not depend on which
+    worker picks the cell up or in what order.
+    """
+    seed, algo, base, expected, repeats = task
+    random.seed(seed)
+    if qsort_numba is not None:
+        qsort_numba.seed(seed)
+    return time_func(algo, base, expected, repeats=repeats)
 
 
-def time_func(func: Callable[[List[int]], List[int]], arr: List[int], repeats: int = 3) -> float:
-    """Best-of-N timing with correctness check."""
-    best = float("inf")
-    for _ in range(repeats):
-        start = time.perf_counter()
-        out = func(arr)
-        end = time.perf_counter()
-        if out != sorted(arr):
-            raise ValueError(f"Sorting failed for {func.__name__}")
-        best = min(best, end - start)
-    return best
+def positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1, got {value}")
+    return value
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Benchmark randomized vs deterministic Quicksort.")
+    parser = argparse.ArgumentParser(
+        description="Benchmark randomized vs deterministic Quicksort against built-in and compiled baselines."
+    )
     parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducibility.")
-    parser.add_argument("--repeats", type=int, default=3, help="Best-of-N runs per cell.")
+    parser.add_argument("--repeats", type=positive_int, default=3, help="Best-of-N runs per cell.")
     parser.add_argument("--csv", type=str, default="", help="Optional CSV output path (e.g., results.csv).")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for benchmark cells (default 1: serial, uncontended timings; "
+        "higher values finish sooner but cells share CPUs).",
+    )
     args = parser.parse_args()
 
     random.seed(args.seed)
@@ -123,41 +281,77 @@ def main() -> None:
     ]
 
     sizes = [1_000, 5_000, 10_000, 20_000, 40_000]
-    # Prevent recursion errors for deterministic first-pivot on sorted inputs
-    sys.setrecursionlimit(max(10000, max(sizes) * 5))
 
     algos = [
         ("RandomizedQuicksort", randomized_quicksort),
         ("DeterministicFirstPivot", deterministic_quicksort_first_pivot),
+        ("DeterministicMedianOf3", deterministic_quicksort_median_of_three),
+        ("TimsortBuiltin", builtin_sort),
     ]
-
-    print("Benchmark: Randomized Quicksort vs Deterministic First-Pivot Quicksort")
-    print(f"Times are best-of-{args.repeats} runs (seconds)\n")
+    numba_sort = None
+    if qsort_numba is not None:
+        numba_sort = qsort_numba.numba_quicksort
+        algos.append(("NumbaQuicksort", numba_sort))
+
+    baselines = ["built-in Timsort"] + (["Numba quicksort"] if qsort_numba is not None else [])
+    print(
+        "Benchmark: Randomized vs Deterministic (First-Pivot, Median-of-3) Quicksort, "
+        f"with {' and '.join(baselines)} baselines"
+    )
+    print(f"Times are best-of-{args.repeats} timeit samples, per call (seconds)\n")
 
     header = f"{'Case':<15}{'n':>8}" + "".join([f"{name:>28}" for name, _ in algos])
     print(header)
     print("-" * len(header))
 
-    rows = []
+    # Every cell is independent and CPU-bound: build them all up front (inputs are
+    # generated here, in order, so they match a serial run) and fan them out.
+    cells = []
+    tasks = []
     for case in cases:
         for n in sizes:
             base = case.generator(n)
-            row = {"case": case.name, "n": n}
-            line = f"{case.name:<15}{n:>8}"
+            expected = bytes(array("q", sorted(base)))
+            # Unbox once per cell, untimed: the list-based sorts then refill their
+            # workspace from a list (pointer copy), while Numba keeps the int64
+            # buffer (memcpy), so no column pays per-element boxing inside timing.
+            base_list = base.tolist()
+            cells.append((case.name, n))
             for name, algo in algos:
-                t = time_func(algo, base, repeats=args.repeats)
+                arr = base if algo is numba_sort else base_list
+                tasks.append((args.seed + len(tasks), algo, arr, expected, args.repeats))
+
+    if args.jobs > 1:
+        ctx = multiprocessing.get_context("spawn")
+        pool = ProcessPoolExecutor(max_workers=min(args.jobs, len(tasks)), mp_context=ctx)
+    else:
+        pool = nullcontext()
+
+    rows = []
+    with pool as executor:
+        times = map(run_cell, tasks) if executor is None else executor.map(run_cell, tasks)
+        prev_case = cells[0][0]
+        for case_name, n in cells:
+            if case_name != prev_case:
+                print()
+                prev_case = case_name
+            row = {"case": case_name, "n": n}
+            line = f"{case_name:<15}{n:>8}"
+            for name, _ in algos:
+                t = next(times)
                 row[name] = t
                 line += f"{t:>28.6f}"
             print(line)
             rows.append(row)
-        print()
+    print()
 
     if args.csv:
+        # Every field is a plain name or number, so no quoting is ever needed
+        names = [name for name, _ in algos]
         with open(args.csv, "w", newline="", encoding="utf-8") as f:
-            fieldnames = ["case", "n"] + [name for name, _ in algos]
-            w = csv.DictWriter(f, fieldnames=fieldnames)
-            w.writeheader()
-            w.writerows(rows)
+            f.write("case,n," + ",".join(names) + "\n")
+            for r in rows:
+                f.write(f"{r['case']},{r['n']}," + ",".join(repr(r[name]) for name in names) + "\n")
         print(f"Wrote CSV results to: {args.csv}")
 
     print("Done.")